@@ -10,11 +10,21 @@ import pandas as pd
 import numpy as np
 import joblib
 import json
+import logging
 import sys
 from pathlib import Path
 from datetime import datetime
 import sqlite3
 
+logger = logging.getLogger(__name__)
+
+# Optional fast JSON serializer - roughly 2x on the small payloads every
+# endpoint returns; falls back to the stdlib encoder when not installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Custom JSON provider to handle NaN values
 class CustomJSONProvider(DefaultJSONProvider):
     def default(self, obj):
@@ -30,6 +40,22 @@ class CustomJSONProvider(DefaultJSONProvider):
             return obj.tolist()
         return super().default(obj)
 
+    def dumps(self, obj, **kwargs):
+        if orjson is not None:
+            # orjson already emits null for NaN/Inf and serializes numpy
+            # scalars/arrays natively; self.default covers the rest
+            return orjson.dumps(
+                obj,
+                default=self.default,
+                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+            ).decode('utf-8')
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
@@ -473,6 +499,72 @@ def predict_fraud():
 
 
 
+@app.route('/api/predict/batch', methods=['POST'])
+def predict_fraud_batch():
+    """
+    Batch fraud scoring endpoint.
+
+    Scores a list of transactions in one request instead of one WSGI
+    round trip per transaction. Scoring only - no rule evaluation,
+    alerting, or storage (use /api/predict for the full pipeline).
+
+    Request JSON:
+    {
+        "transactions": [
+            {"customer_id": "C123", "transaction_amount": 5000, ...},
+            ...
+        ]
+    }
+
+    Response:
+    {
+        "success": true,
+        "count": 2,
+        "results": [{"prediction": "Fraud", "risk_score": 0.92, ...}, ...]
+    }
+    """
+    try:
+        from src.realtime.realtime_predictor import get_predictor
+
+        data = request.get_json()
+
+        if not data or 'transactions' not in data:
+            return jsonify({
+                'success': False,
+                'error': 'No transactions provided'
+            }), 400
+
+        transactions = data['transactions']
+        if not isinstance(transactions, list) or len(transactions) == 0:
+            return jsonify({
+                'success': False,
+                'error': 'transactions must be a non-empty list'
+            }), 400
+
+        if len(transactions) > 1000:
+            return jsonify({
+                'success': False,
+                'error': 'Batch size exceeds maximum allowed (1000)'
+            }), 400
+
+        predictor = get_predictor()
+        results = predictor.predict_batch(transactions)
+
+        return jsonify({
+            'success': True,
+            'count': len(results),
+            'results': results
+        })
+
+    except Exception as e:
+        logger.error(f"Batch prediction error: {e}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': 'An internal error occurred processing the batch. Please try again.',
+            'error_code': 'PREDICTION_ERROR'
+        }), 500
+
+
 @app.route('/api/alerts', methods=['GET'])
 def get_alerts():
     """
@@ -140,8 +140,13 @@ def init_database():
                 available_cols = [col for col in columns_to_insert if col in df.columns]
                 df_subset = df[available_cols]
                 
-                # Insert data
-                df_subset.to_sql('transactions', conn, if_exists='append', index=False)
+                # Insert data; method='multi' emits multi-row VALUES
+                # statements instead of one INSERT per row. chunksize is
+                # capped so rows x columns stays under SQLite's ~999
+                # bound-parameter limit.
+                df_subset.to_sql('transactions', conn, if_exists='append',
+                                 index=False, method='multi',
+                                 chunksize=max(1, 900 // max(1, len(available_cols))))
                 
                 print(f"✅ Loaded {len(df)} transactions from CSV")
                 
@@ -181,7 +181,7 @@ class AlertManager:
             logger.error(f"Error creating alert: {e}")
             return None
     
-    def get_alerts(self, 
+    def get_alerts(self,
                    customer_id: str = None,
                    severity: str = None,
                    status: str = None,
@@ -7,10 +7,32 @@ Combines deterministic rules with ML predictions for hybrid fraud detection.
 from typing import Dict, Any, List, Tuple
 from datetime import datetime
 import sqlite3
+import threading
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Channels treated as international (frozenset for O(1) membership checks)
+_INTERNATIONAL_CHANNELS = frozenset({'international', 'foreign', 'overseas'})
+
+# Code templates for rules that can be inlined into the compiled evaluator.
+# Each template computes `rc` (risk contribution, 0.0 = not triggered) from
+# the pre-extracted amount/kyc/age/channel locals; thresholds are baked in
+# from rules_config at compile time.
+_INLINE_RULE_TEMPLATES = {
+    'high_amount_unverified_kyc':
+        "rc = (0.80 if amount > 10000 else 0.65 if amount > 5000 else 0.0) if kyc == 0 else 0.0",
+    'new_account_high_amount':
+        "rc = min(0.75 + min((amount - {high_risk_amount}) / 100000, 0.2), 0.95) "
+        "if (age < {new_account_days} and amount > {high_risk_amount}) else 0.0",
+    'international_unverified':
+        "rc = 0.85 if (channel and kyc == 0 and channel.lower() in _INTERNATIONAL_CHANNELS) else 0.0",
+    'low_amount_trust':
+        "rc = -0.30 if 0 < amount < {low_amount_threshold} else 0.0",
+    'established_customer_discount':
+        "rc = -0.10 if (kyc == 1 and age >= 365) else 0.0",
+}
+
 
 class RuleEngine:
     """
@@ -29,7 +51,40 @@ class RuleEngine:
         self.db_path = db_path
         self.rules_config = rules_config or self._default_config()
         self.rules = []
+        self._compiled_evaluate = None
         self.load_rules()
+        self._check_query_plan()
+
+    def _check_query_plan(self):
+        """
+        Verify the customer average query is served by an index.
+
+        Without an index on (customer_id, is_fraud) the AVG lookup degrades
+        to a full table scan per rule invocation. Logs a warning when the
+        planner reports SCAN instead of SEARCH so missing indexes are
+        visible at startup rather than as silent latency.
+        """
+        try:
+            # Read-only URI: a plain connect() creates an empty database
+            # file as a side effect when none exists yet
+            conn = sqlite3.connect(f'file:{self.db_path}?mode=ro', uri=True)
+            cursor = conn.cursor()
+            cursor.execute('''
+                EXPLAIN QUERY PLAN
+                SELECT AVG(transaction_amount)
+                FROM transactions
+                WHERE customer_id = ? AND is_fraud = 0
+            ''', ('_plan_check_',))
+            plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+            conn.close()
+
+            if 'SCAN' in plan and 'SEARCH' not in plan:
+                logger.warning(
+                    "Customer average query uses a full table SCAN - "
+                    "create idx_txn_customer_fraud_amount (see setup_alerts_db.py)"
+                )
+        except Exception as e:
+            logger.debug(f"Query plan check skipped: {e}")
         
     def _default_config(self) -> Dict:
         """Default rule configuration."""
@@ -98,8 +153,63 @@ class RuleEngine:
         
         # Sort by priority (highest first)
         self.rules.sort(key=lambda x: x['priority'], reverse=True)
+        self._compile_rules()
         logger.info(f"✓ Loaded {len(self.rules)} fraud detection rules")
-    
+
+    def _compile_rules(self):
+        """
+        Generate a specialized evaluator for the current rule set.
+
+        The rule set is fixed after load_rules, so instead of dispatching
+        through `rule['func'](tx)` dict lookups per transaction, we emit one
+        Python function that inlines the pure threshold rules (with config
+        values baked in as literals) and calls through to the DB-backed
+        rules. Falls back to the interpreted loop if codegen fails.
+        """
+        try:
+            lines = [
+                "def _compiled(tx):",
+                "    amount = float(tx.get('transaction_amount', 0) or 0)",
+                "    kyc = int(tx.get('kyc_verified', 0) or 0)",
+                "    age = float(tx.get('account_age_days', 0) or 0)",
+                "    channel = tx.get('channel', '')",
+                "    triggered = []",
+                "    scores = []",
+            ]
+
+            for i, rule in enumerate(self.rules):
+                entry = (
+                    f"{{'name': {rule['name']!r}, 'reason': {rule['reason']!r}, "
+                    f"'priority': {rule['priority']!r}, 'risk_contribution': rc}}"
+                )
+                template = _INLINE_RULE_TEMPLATES.get(rule['name'])
+                if template:
+                    lines.append(f"    {template.format(**self.rules_config)}")
+                    lines.append("    if rc != 0.0:")
+                else:
+                    lines.append("    try:")
+                    lines.append(f"        hit, rc = _funcs[{i}](tx)")
+                    lines.append("    except Exception as e:")
+                    lines.append(f"        logger.error(\"Error evaluating rule '{rule['name']}': %s\", e)")
+                    lines.append("        hit, rc = False, 0.0")
+                    lines.append("    if hit:")
+                lines.append(f"        triggered.append({entry})")
+                lines.append("        scores.append(rc)")
+
+            lines.append("    return triggered, scores")
+
+            namespace = {
+                '_funcs': [rule['func'] for rule in self.rules],
+                '_INTERNATIONAL_CHANNELS': _INTERNATIONAL_CHANNELS,
+                'logger': logger,
+            }
+            exec('\n'.join(lines), namespace)
+            self._compiled_evaluate = namespace['_compiled']
+
+        except Exception as e:
+            logger.warning(f"Rule compilation failed, using interpreted path: {e}")
+            self._compiled_evaluate = None
+
     def add_rule(self, rule_name: str, rule_func: callable, priority: int = 1, reason: str = None):
         """
         Add a new rule to the engine.
@@ -117,6 +227,8 @@ class RuleEngine:
             'reason': reason or rule_name
         })
         self.rules.sort(key=lambda x: x['priority'], reverse=True)
+        # Rule set changed: regenerate the compiled evaluator
+        self._compile_rules()
     
     def evaluate_transaction(self, 
                             transaction_data: Dict[str, Any],
@@ -131,26 +243,8 @@ class RuleEngine:
         Returns:
             Combined evaluation result with triggered rules and final decision
         """
-        triggered_rules = []
-        rule_risk_scores = []
-        
-        # Evaluate each rule
-        for rule in self.rules:
-            try:
-                is_triggered, risk_contribution = rule['func'](transaction_data)
-                
-                if is_triggered:
-                    triggered_rules.append({
-                        'name': rule['name'],
-                        'reason': rule['reason'],
-                        'priority': rule['priority'],
-                        'risk_contribution': risk_contribution
-                    })
-                    rule_risk_scores.append(risk_contribution)
-                    
-            except Exception as e:
-                logger.error(f"Error evaluating rule '{rule['name']}': {e}")
-        
+        triggered_rules, rule_risk_scores = self._evaluate_rules(transaction_data)
+
         # Calculate rule-based risk score
         # Separate positive (risk increase) and negative (risk decrease) rules
         positive_rules = [score for score in rule_risk_scores if score > 0]
@@ -200,7 +294,44 @@ class RuleEngine:
         }
         
         return result
-    
+
+    def _evaluate_rules(self, transaction_data: Dict[str, Any]) -> Tuple[List[Dict], List[float]]:
+        """
+        Run all rules against a transaction.
+
+        Uses the compiled evaluator when available; falls back to the
+        interpreted per-rule loop on compilation failure or runtime error.
+
+        Returns:
+            (triggered_rules, rule_risk_scores)
+        """
+        if self._compiled_evaluate is not None:
+            try:
+                return self._compiled_evaluate(transaction_data)
+            except Exception as e:
+                logger.error(f"Compiled rule evaluation failed, falling back: {e}")
+
+        triggered_rules = []
+        rule_risk_scores = []
+
+        for rule in self.rules:
+            try:
+                is_triggered, risk_contribution = rule['func'](transaction_data)
+
+                if is_triggered:
+                    triggered_rules.append({
+                        'name': rule['name'],
+                        'reason': rule['reason'],
+                        'priority': rule['priority'],
+                        'risk_contribution': risk_contribution
+                    })
+                    rule_risk_scores.append(risk_contribution)
+
+            except Exception as e:
+                logger.error(f"Error evaluating rule '{rule['name']}': {e}")
+
+        return triggered_rules, rule_risk_scores
+
     def check_high_amount_vs_average(self, transaction_data: Dict) -> Tuple[bool, float]:
         """
         Rule 1: Check if transaction amount > 5x user's average.
@@ -245,12 +376,12 @@ class RuleEngine:
         Returns:
             (triggered, risk_contribution)
         """
-        channel = transaction_data.get('channel', '').lower()
+        channel = transaction_data.get('channel', '')
         kyc_verified = int(transaction_data.get('kyc_verified', 0))
-        
-        # Check if international transaction
-        is_international = channel in ['international', 'foreign', 'overseas']
-        
+
+        # Check if international transaction (hash lookup, no list scan)
+        is_international = bool(channel) and channel.lower() in _INTERNATIONAL_CHANNELS
+
         if is_international and kyc_verified == 0:
             return True, 0.85  # High risk
         
@@ -354,7 +485,7 @@ class RuleEngine:
             cursor.execute('''
                 SELECT AVG(transaction_amount)
                 FROM transactions
-                WHERE user_id = ?
+                WHERE customer_id = ?
                 AND is_fraud = 0
                 LIMIT 100
             ''', (customer_id,))
@@ -436,7 +567,7 @@ class RuleEngine:
             cursor.execute('''
                 SELECT COUNT(*) as total, SUM(is_fraud) as fraud_count
                 FROM transactions
-                WHERE user_id = ?
+                WHERE customer_id = ?
             ''', (customer_id,))
             
             result = cursor.fetchone()
@@ -480,22 +611,29 @@ class RuleEngine:
 
 # Global instance
 _rule_engine_instance = None
+_rule_engine_lock = threading.Lock()
 
 
 def get_rule_engine(db_path: str = 'data/transactions.db') -> RuleEngine:
     """
     Get singleton rule engine instance.
-    
+
+    Thread-safe: under concurrent first calls, double-checked locking
+    ensures exactly one engine is constructed (rule compilation and the
+    SQLite plan check run once, not per racing thread).
+
     Args:
         db_path: Path to database
-        
+
     Returns:
         RuleEngine instance
     """
     global _rule_engine_instance
-    
+
     if _rule_engine_instance is None:
-        logger.info("Initializing RuleEngine (first time)...")
-        _rule_engine_instance = RuleEngine(db_path=db_path)
-    
+        with _rule_engine_lock:
+            if _rule_engine_instance is None:
+                logger.info("Initializing RuleEngine (first time)...")
+                _rule_engine_instance = RuleEngine(db_path=db_path)
+
     return _rule_engine_instance
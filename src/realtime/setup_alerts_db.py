@@ -16,7 +16,11 @@ def create_fraud_alerts_table(db_path: str = 'data/transactions.db'):
     """
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
-    
+
+    # Enable write-ahead logging so bulk alert writers don't block readers.
+    # WAL is persistent: setting it once here applies to all future connections.
+    cursor.execute('PRAGMA journal_mode=WAL')
+
     # Create fraud_alerts table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS fraud_alerts (
@@ -64,6 +68,19 @@ def create_fraud_alerts_table(db_path: str = 'data/transactions.db'):
         ON fraud_alerts(created_at DESC)
     ''')
     
+    # Covering index for the rule engine's per-customer lookups
+    # (AVG(transaction_amount) / fraud-count queries). The third column
+    # lets SQLite answer the AVG from the index without touching rows.
+    cursor.execute('''
+        SELECT name FROM sqlite_master
+        WHERE type='table' AND name='transactions'
+    ''')
+    if cursor.fetchone():
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_txn_customer_fraud_amount
+            ON transactions(customer_id, is_fraud, transaction_amount)
+        ''')
+
     # Create alert statistics view
     cursor.execute('''
         CREATE VIEW IF NOT EXISTS alert_statistics AS
@@ -0,0 +1,181 @@
+"""
+Shared pytest fixtures for the test suite.
+
+Session-scoped data fixtures parse each CSV once per run; test modules
+wrap them in thin function-scoped fixtures that skip when the file is
+missing.
+"""
+
+import os
+import sys
+import pytest
+import pandas as pd
+from pathlib import Path
+
+# Add parent directory to path so src imports resolve
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+PROCESSED_CSV = Path('data/processed/transactions_processed.csv')
+TRAIN_CSV = Path('data/processed/train.csv')
+TEST_CSV = Path('data/processed/test.csv')
+
+# Columns the tests actually reference, with narrow dtypes so the
+# fixture load skips type inference and unused columns entirely
+REQUIRED_COLS = [
+    'transaction_id', 'customer_id', 'transaction_amount', 'is_fraud',
+    'kyc_verified', 'channel', 'account_age_days', 'is_high_value',
+    'timestamp'
+]
+SCHEMA = {
+    'transaction_id': 'string',
+    'customer_id': 'string',
+    'transaction_amount': 'float64',
+    'is_fraud': 'int8',
+    'kyc_verified': 'int8',
+    'is_high_value': 'int8',
+    'account_age_days': 'int32',
+    'channel': 'category',
+}
+
+
+def post_json(client, url, payload):
+    """POST a JSON payload to the test client.
+
+    Accepts either a dict (encoded by the client) or pre-serialized
+    bytes (posted as-is), so the content-type boilerplate lives in one
+    place instead of at every call site.
+    """
+    if isinstance(payload, (bytes, bytearray)):
+        return client.post(url, data=payload, content_type='application/json')
+    return client.post(url, json=payload)
+
+
+def _load_csv(path: Path):
+    """Parse a CSV once, or return None when it doesn't exist."""
+    if not path.exists():
+        return None
+    return pd.read_csv(path)
+
+
+@pytest.fixture(scope='session')
+def processed_csv_stat():
+    """Cached os.stat of the processed CSV (None when missing).
+
+    One syscall per session; existence/size tests and the data fixture
+    all read from this instead of re-statting the file, which matters on
+    networked CI filesystems where stat is a round trip.
+    """
+    try:
+        return os.stat(PROCESSED_CSV)
+    except FileNotFoundError:
+        return None
+
+
+@pytest.fixture(scope='session')
+def processed_df_cached(processed_csv_stat):
+    """Processed transactions, parsed once per session (None if missing)."""
+    if processed_csv_stat is None:
+        return None
+
+    header = pd.read_csv(PROCESSED_CSV, nrows=0).columns
+    usecols = [c for c in REQUIRED_COLS if c in header]
+    dtypes = {c: t for c, t in SCHEMA.items() if c in header}
+    parse_dates = ['timestamp'] if 'timestamp' in header else []
+
+    try:
+        # Arrow's multi-threaded parser; falls back to the C engine when
+        # pyarrow is unavailable or rejects the schema
+        return pd.read_csv(PROCESSED_CSV, engine='pyarrow', usecols=usecols,
+                           dtype=dtypes, parse_dates=parse_dates)
+    except (ImportError, ValueError):
+        return pd.read_csv(PROCESSED_CSV, usecols=usecols, dtype=dtypes,
+                           parse_dates=parse_dates, low_memory=False,
+                           cache_dates=True)
+
+
+@pytest.fixture(scope='session')
+def train_df_cached():
+    """Training split, parsed once per session (None if missing)."""
+    return _load_csv(TRAIN_CSV)
+
+
+@pytest.fixture(scope='session')
+def test_df_cached():
+    """Test split, parsed once per session (None if missing)."""
+    return _load_csv(TEST_CSV)
+
+
+@pytest.fixture(scope='session')
+def app():
+    """Flask application, imported once for the whole session.
+
+    Importing src.api.app wires the predictor/rule engine/database, so
+    keeping it inside the fixture avoids paying that cost for data-only
+    test runs.
+    """
+    from src.api.app import app as flask_app
+    flask_app.config['TESTING'] = True
+    return flask_app
+
+
+@pytest.fixture(scope='session')
+def client(app):
+    """Flask test client, shared across the session (safe with TESTING)."""
+    with app.test_client() as client:
+        yield client
+
+
+@pytest.fixture(scope='session')
+def predictor():
+    """ML predictor singleton - loads the pickled model/scaler once."""
+    from src.realtime.realtime_predictor import get_predictor
+    return get_predictor()
+
+
+@pytest.fixture(scope='session')
+def rule_engine():
+    """Rule engine singleton - parses the rules config once."""
+    from src.realtime.rule_engine import get_rule_engine
+    return get_rule_engine()
+
+
+@pytest.fixture(scope='session')
+def explainer():
+    """LLM explainer singleton."""
+    from src.realtime.explainer import get_explainer
+    return get_explainer()
+
+
+# Canonical transactions used across the prediction/rule-engine tests
+CANONICAL_TXNS = {
+    'sample': {'customer_id': 'TEST_C123', 'transaction_amount': 5000,
+               'channel': 'Web', 'kyc_verified': 1, 'account_age_days': 365},
+    'low': {'customer_id': 'C1', 'transaction_amount': 100,
+            'kyc_verified': 1, 'account_age_days': 365},
+    'high': {'customer_id': 'C1', 'transaction_amount': 100000,
+             'kyc_verified': 1, 'account_age_days': 365},
+    'no_kyc': {'customer_id': 'TEST', 'transaction_amount': 12000,
+               'kyc_verified': 0, 'account_age_days': 100},
+    'new_acct': {'customer_id': 'TEST', 'transaction_amount': 8000,
+                 'kyc_verified': 1, 'account_age_days': 5},
+    'legit': {'customer_id': 'TEST', 'transaction_amount': 100,
+              'kyc_verified': 1, 'account_age_days': 1000},
+}
+
+
+@pytest.fixture(scope='session')
+def canonical_transactions():
+    """The canonical transaction payloads, keyed by scenario name."""
+    return CANONICAL_TXNS
+
+
+@pytest.fixture(scope='session')
+def canonical_predictions(predictor):
+    """One batch prediction over the canonical transactions.
+
+    Running them through predict_batch once amortizes the per-call
+    preprocessing/model overhead across every test that only needs the
+    scores.
+    """
+    results = predictor.predict_batch(list(CANONICAL_TXNS.values()))
+    return dict(zip(CANONICAL_TXNS.keys(), results))
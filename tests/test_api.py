@@ -3,26 +3,24 @@ API endpoint tests for Transaction Intelligence API
 """
 
 import pytest
-import sys
-from pathlib import Path
 
-# Add parent directory to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# The Flask app import and session-scoped `client` fixture live in
+# conftest.py so the app (and the model it loads) is built once for the
+# whole test session rather than per module.
 
-from src.api.app import app
 
+class TestAPIEndpoints:
+    """Test suite for API endpoints."""
 
-@pytest.fixture
-def client():
-    """Create a test client for the Flask app."""
-    app.config['TESTING'] = True
-    with app.test_client() as client:
-        yield client
+    @pytest.fixture(scope='class')
+    def metrics_response(self, client):
+        """Fetch /api/metrics once for the whole class.
 
+        Three tests inspect the same payload; one shared request avoids
+        re-running the metrics aggregation per test.
+        """
+        return client.get('/api/metrics')
 
-class TestAPIEndpoints:
-    """Test suite for API endpoints."""
-    
     def test_health_check(self, client):
         """Test health check endpoint returns 200."""
         response = client.get('/api/health')
@@ -31,12 +29,11 @@ class TestAPIEndpoints:
         assert data['success'] is True
         assert data['status'] == 'healthy'
     
-    def test_metrics_endpoint(self, client):
+    def test_metrics_endpoint(self, metrics_response):
         """Test metrics endpoint returns 200 and required keys."""
-        response = client.get('/api/metrics')
-        assert response.status_code == 200
-        
-        data = response.get_json()
+        assert metrics_response.status_code == 200
+
+        data = metrics_response.get_json()
         assert data['success'] is True
         assert 'metrics' in data
         
@@ -70,19 +67,17 @@ class TestAPIEndpoints:
         assert metrics['fraud_count'] <= metrics['total_transactions'], \
             "Fraud count cannot exceed total transactions"
     
-    def test_metrics_values_non_null(self, client):
+    def test_metrics_values_non_null(self, metrics_response):
         """Test that all metric values are non-null."""
-        response = client.get('/api/metrics')
-        data = response.get_json()
+        data = metrics_response.get_json()
         metrics = data['metrics']
         
         for key, value in metrics.items():
             assert value is not None, f"Metric {key} is null"
     
-    def test_metrics_fraud_rate_calculation(self, client):
+    def test_metrics_fraud_rate_calculation(self, metrics_response):
         """Test fraud rate is correctly calculated."""
-        response = client.get('/api/metrics')
-        data = response.get_json()
+        data = metrics_response.get_json()
         metrics = data['metrics']
         
         expected_rate = (metrics['fraud_count'] / metrics['total_transactions'] * 100) \
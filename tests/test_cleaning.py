@@ -3,6 +3,7 @@ Unit tests for data cleaning pipeline.
 """
 
 import pytest
+import numpy as np
 import pandas as pd
 from pathlib import Path
 
@@ -10,17 +11,25 @@ from pathlib import Path
 class TestDataCleaning:
     """Test suite for cleaned transaction data."""
     
-    @pytest.fixture
+    # Columns the tests below actually touch - reading only these keeps
+    # the fixture load cheap on wide CSVs
+    TESTED_COLUMNS = {
+        'transaction_id', 'customer_id', 'transaction_amount',
+        'kyc_verified', 'channel', 'timestamp', 'is_high_value'
+    }
+
+    @pytest.fixture(scope='class')
     def processed_csv_path(self):
         """Path to processed CSV file."""
         return Path('data/processed/transactions_processed.csv')
-    
-    @pytest.fixture
+
+    @pytest.fixture(scope='class')
     def processed_df(self, processed_csv_path):
-        """Load processed DataFrame."""
+        """Load processed DataFrame once per class instead of per test."""
         if not processed_csv_path.exists():
             pytest.skip(f"Processed CSV not found: {processed_csv_path}")
-        return pd.read_csv(processed_csv_path)
+        return pd.read_csv(processed_csv_path,
+                           usecols=lambda c: c in self.TESTED_COLUMNS)
     
     def test_no_null_transaction_ids(self, processed_df):
         """Assert no nulls in transaction_id column."""
@@ -62,8 +71,10 @@ class TestDataCleaning:
     def test_high_value_flag_correctness(self, processed_df):
         """Assert is_high_value flag is correctly calculated."""
         if 'is_high_value' in processed_df.columns and 'transaction_amount' in processed_df.columns:
-            expected_high_value = (processed_df['transaction_amount'] > 50000).astype(int)
-            assert (processed_df['is_high_value'] == expected_high_value).all(), "is_high_value flag incorrect"
+            amt = processed_df['transaction_amount'].to_numpy()
+            flag = processed_df['is_high_value'].to_numpy()
+            expected_high_value = (amt > 50000).astype(np.int8)
+            assert np.array_equal(flag.astype(np.int8), expected_high_value), "is_high_value flag incorrect"
     
     def test_required_columns_exist(self, processed_df):
         """Assert all required columns exist."""
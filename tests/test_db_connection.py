@@ -0,0 +1,66 @@
+"""
+Test suite for TransactionDB bulk insert.
+Covers the executemany ingest path, including missing values in the
+extension-dtype columns from CSV_DTYPES.
+"""
+
+import pandas as pd
+import pytest
+
+from src.utils.db_connection import TransactionDB, CSV_DTYPES
+
+
+@pytest.fixture
+def db(tmp_path):
+    """TransactionDB backed by a throwaway database file."""
+    database = TransactionDB(db_path=str(tmp_path / 'test.db'))
+    yield database
+    database.close()
+
+
+class TestInsertTransactions:
+    """Test suite for bulk transaction ingest."""
+
+    def test_insert_with_missing_values(self, db):
+        """Missing values in string/Int8 columns are stored as NULL."""
+        df = pd.DataFrame({
+            'transaction_id': ['T1', 'T2'],
+            'customer_id': ['C1', None],
+            'kyc_verified': [1, None],
+            'transaction_amount': [100.0, 250.0],
+        }).astype({k: v for k, v in CSV_DTYPES.items()
+                   if k in ('transaction_id', 'customer_id',
+                            'kyc_verified', 'transaction_amount')})
+
+        # string/Int8 dtypes hold pd.NA, which sqlite3 cannot bind raw
+        assert df['customer_id'].isna().any()
+
+        db.insert_transactions(df)
+
+        rows = db.conn.execute(
+            "SELECT transaction_id, customer_id, kyc_verified "
+            "FROM transactions ORDER BY transaction_id"
+        ).fetchall()
+
+        assert rows == [('T1', 'C1', 1), ('T2', None, None)]
+
+    def test_insert_without_missing_values(self, db):
+        """Fully populated frames round-trip unchanged."""
+        df = pd.DataFrame({
+            'transaction_id': ['T1'],
+            'customer_id': ['C1'],
+            'transaction_amount': [99.5],
+        })
+
+        db.insert_transactions(df)
+
+        row = db.conn.execute(
+            "SELECT transaction_id, customer_id, transaction_amount "
+            "FROM transactions"
+        ).fetchone()
+
+        assert row == ('T1', 'C1', 99.5)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '--tb=short'])
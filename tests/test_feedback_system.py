@@ -0,0 +1,122 @@
+"""
+Manual Feedback System Test Script
+Exercises the feedback API endpoints end-to-end against a running backend
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+
+BASE_URL = "http://localhost:8001"
+
+# One session for the whole script: keep-alive reuses the TCP connection
+# across calls instead of paying a fresh handshake per request
+SESSION = requests.Session()
+SESSION.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=4))
+
+TIMEOUT = 5
+
+
+def run_tests():
+    """Run all feedback system checks"""
+    print("=" * 80)
+    print("FEEDBACK SYSTEM TESTS")
+    print("=" * 80)
+    print()
+
+    passed = 0
+    failed = 0
+
+    # 1. Find a transaction to give feedback on
+    print("Test 1/4: Fetch a transaction")
+    transaction_id = None
+    try:
+        response = SESSION.get(f"{BASE_URL}/api/transactions", timeout=TIMEOUT)
+        if response.status_code == 200:
+            transactions = response.json().get('transactions', [])
+            if transactions:
+                transaction_id = transactions[0].get('transaction_id')
+                print(f"✅ PASS - Got transaction {transaction_id}")
+                passed += 1
+            else:
+                print("❌ FAIL - No transactions in database")
+                failed += 1
+        else:
+            print(f"❌ FAIL - Status {response.status_code}")
+            failed += 1
+    except Exception as e:
+        print(f"❌ FAIL - Exception: {e}")
+        failed += 1
+    print()
+
+    # 2. Submit feedback for it
+    print("Test 2/4: Submit feedback")
+    try:
+        response = SESSION.post(
+            f"{BASE_URL}/api/feedback",
+            json={
+                "transaction_id": transaction_id or "T_MISSING",
+                "actual_label": "Legitimate",
+                "notes": "feedback system test"
+            },
+            timeout=TIMEOUT
+        )
+        if response.status_code == 201 and response.json().get('success'):
+            print(f"✅ PASS - Feedback ID {response.json()['feedback_id']}")
+            passed += 1
+        else:
+            print(f"❌ FAIL - Status {response.status_code}: {response.text[:200]}")
+            failed += 1
+    except Exception as e:
+        print(f"❌ FAIL - Exception: {e}")
+        failed += 1
+    print()
+
+    # 3. Check stats reflect the submission
+    print("Test 3/4: Feedback stats")
+    try:
+        response = SESSION.get(f"{BASE_URL}/api/feedback/stats", timeout=TIMEOUT)
+        data = response.json()
+        if response.status_code == 200 and data.get('total_feedback', 0) >= 1:
+            print(f"✅ PASS - {data['total_feedback']} feedback records, "
+                  f"accuracy {data.get('model_accuracy')}%")
+            passed += 1
+        else:
+            print(f"❌ FAIL - Status {response.status_code}: {data}")
+            failed += 1
+    except Exception as e:
+        print(f"❌ FAIL - Exception: {e}")
+        failed += 1
+    print()
+
+    # 4. Recent feedback includes our record
+    print("Test 4/4: Recent feedback")
+    try:
+        response = SESSION.get(f"{BASE_URL}/api/feedback/recent",
+                               params={"limit": 5}, timeout=TIMEOUT)
+        data = response.json()
+        if response.status_code == 200 and data.get('count', 0) >= 1:
+            print(f"✅ PASS - {data['count']} recent entries")
+            passed += 1
+        else:
+            print(f"❌ FAIL - Status {response.status_code}: {data}")
+            failed += 1
+    except Exception as e:
+        print(f"❌ FAIL - Exception: {e}")
+        failed += 1
+    print()
+
+    print("=" * 80)
+    print(f"RESULTS: {passed} passed, {failed} failed out of 4 tests")
+    print("=" * 80)
+
+    return passed, failed
+
+
+if __name__ == "__main__":
+    try:
+        passed, failed = run_tests()
+        exit(0 if failed == 0 else 1)
+    except requests.exceptions.ConnectionError:
+        print("❌ ERROR: Cannot connect to API at", BASE_URL)
+        print("   Make sure the Flask backend is running on port 8001")
+        exit(1)
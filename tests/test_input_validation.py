@@ -4,10 +4,18 @@ Tests all the new validation rules added to the /api/predict endpoint
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 import json
 
 API_URL = "http://localhost:8001/api/predict"
 
+# One session for the whole script so keep-alive reuses the connection
+# across cases instead of a fresh TCP handshake per request
+SESSION = requests.Session()
+SESSION.headers.update({"Content-Type": "application/json"})
+SESSION.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
 # Test cases
 test_cases = [
     {
@@ -109,45 +117,50 @@ test_cases = [
     }
 ]
 
+def _run_one(test):
+    """Issue one test case's request; returns (status, error, exception)."""
+    try:
+        response = SESSION.post(API_URL, json=test['data'])
+        error = response.json().get('error') if response.status_code == 400 else None
+        return response.status_code, error, None
+    except Exception as e:
+        return None, None, e
+
+
 def run_tests():
     """Run all test cases"""
     print("=" * 80)
     print("API INPUT VALIDATION TESTS")
     print("=" * 80)
     print()
-    
+
     passed = 0
     failed = 0
-    
-    for i, test in enumerate(test_cases, 1):
+
+    # The cases are independent HTTP round trips, so issue them
+    # concurrently and report serially - wall time becomes roughly the
+    # slowest request instead of the sum
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(_run_one, test_cases))
+
+    for i, (test, (status, error, exc)) in enumerate(zip(test_cases, results), 1):
         print(f"Test {i}/{len(test_cases)}: {test['name']}")
         print(f"Description: {test['description']}")
-        
-        try:
-            response = requests.post(
-                API_URL,
-                json=test['data'],
-                headers={"Content-Type": "application/json"}
-            )
-            
-            status = response.status_code
-            
-            if status == test['expected_status']:
-                print(f"✅ PASS - Got expected status {status}")
-                passed += 1
-            else:
-                print(f"❌ FAIL - Expected {test['expected_status']}, got {status}")
-                failed += 1
-            
-            # Print response for failed validations
-            if status == 400:
-                data = response.json()
-                print(f"   Error: {data.get('error')}")
-            
-        except Exception as e:
-            print(f"❌ FAIL - Exception: {e}")
+
+        if exc is not None:
+            print(f"❌ FAIL - Exception: {exc}")
             failed += 1
-        
+        elif status == test['expected_status']:
+            print(f"✅ PASS - Got expected status {status}")
+            passed += 1
+        else:
+            print(f"❌ FAIL - Expected {test['expected_status']}, got {status}")
+            failed += 1
+
+        # Print response for failed validations
+        if status == 400:
+            print(f"   Error: {error}")
+
         print()
     
     print("=" * 80)
@@ -3,30 +3,52 @@ Comprehensive Backend Tests - Milestone 4
 Tests for fraud prediction, rule engine, LLM, and all API endpoints.
 """
 
+import json as _json
+from math import isclose as _isclose
+
 import pytest
-import json
-import sys
-from pathlib import Path
 
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
+from conftest import post_json
+
+
+def _prejson(payload):
+    """Serialize a fixed payload once at module import.
+
+    Tests that POST a literal payload (sometimes more than once) pass
+    these bytes directly, skipping the per-call json.dumps inside the
+    test client.
+    """
+    return _json.dumps(payload).encode()
+
+
+def _is_failure_body(response):
+    """Check success=false via a byte scan instead of a JSON parse.
 
-from flask import Flask
-from src.api.app import app
-import sqlite3
+    The failure responses have a known flat shape, so a substring probe
+    (memmem at C speed) is enough; both compact and spaced encodings
+    are covered. Tests that inspect nested fields still parse fully.
+    """
+    return (b'"success":false' in response.data
+            or b'"success": false' in response.data)
+
+
+PAYLOAD_10M = _prejson({"customer_id": "C123", "transaction_amount": 10000000})
+PAYLOAD_UNDER_10M = _prejson({"customer_id": "C123", "transaction_amount": 9999999})
+PAYLOAD_CONSISTENCY = _prejson({
+    "customer_id": "CONSISTENCY_TEST",
+    "transaction_amount": 3000,
+    "kyc_verified": 1,
+    "account_age_days": 500
+})
 
 
 # ============================================================================
 # FIXTURES
 # ============================================================================
 
-@pytest.fixture
-def client():
-    """Flask test client"""
-    app.config['TESTING'] = True
-    with app.test_client() as client:
-        yield client
-
+# The Flask app import and the session-scoped `client` fixture moved to
+# conftest.py so the app (and its model warm-load) happens once per
+# session instead of once per importing module.
 
 @pytest.fixture
 def sample_transaction():
@@ -59,39 +81,26 @@ def fraud_transaction():
 class TestFraudPredictionLogic:
     """Test core fraud detection logic"""
     
-    def test_ml_model_loaded(self):
+    def test_ml_model_loaded(self, predictor):
         """Test that ML model is loaded correctly"""
-        from src.realtime.realtime_predictor import get_predictor
-        
-        predictor = get_predictor()
         assert predictor is not None
         assert predictor.model is not None
         assert predictor.scaler is not None
-    
-    def test_predictor_returns_risk_score(self, sample_transaction):
+
+    def test_predictor_returns_risk_score(self, canonical_predictions):
         """Test predictor returns valid risk score"""
-        from src.realtime.realtime_predictor import get_predictor
-        
-        predictor = get_predictor()
-        result = predictor.predict(sample_transaction)
-        
+        result = canonical_predictions['sample']
+
         assert 'risk_score' in result
         assert 'prediction' in result
         assert 0 <= result['risk_score'] <= 1
         assert result['prediction'] in ['Fraud', 'Legitimate']
-    
-    def test_high_amount_increases_risk(self):
+
+    def test_high_amount_increases_risk(self, canonical_predictions):
         """Test that higher amounts increase risk score"""
-        from src.realtime.realtime_predictor import get_predictor
-        
-        predictor = get_predictor()
-        
-        low_amount = {"customer_id": "C1", "transaction_amount": 100, "kyc_verified": 1, "account_age_days": 365}
-        high_amount = {"customer_id": "C1", "transaction_amount": 100000, "kyc_verified": 1, "account_age_days": 365}
-        
-        low_result = predictor.predict(low_amount)
-        high_result = predictor.predict(high_amount)
-        
+        low_result = canonical_predictions['low']
+        high_result = canonical_predictions['high']
+
         # High amount should have equal or higher risk
         assert high_result['risk_score'] >= low_result['risk_score']
 
@@ -103,74 +112,35 @@ class TestFraudPredictionLogic:
 class TestRuleEngine:
     """Test rule-based fraud detection"""
     
-    def test_rule_engine_loaded(self):
+    def test_rule_engine_loaded(self, rule_engine):
         """Test rule engine initializes"""
-        from src.realtime.rule_engine import get_rule_engine
-        
-        engine = get_rule_engine()
-        assert engine is not None
-        assert len(engine.rules) > 0
-    
-    def test_high_amount_no_kyc_triggers_rule(self):
+        assert rule_engine is not None
+        assert len(rule_engine.rules) > 0
+
+    def test_high_amount_no_kyc_triggers_rule(self, rule_engine, canonical_transactions, canonical_predictions):
         """Test that high amount without KYC triggers rule"""
-        from src.realtime.rule_engine import get_rule_engine
-        from src.realtime.realtime_predictor import get_predictor
-        
-        engine = get_rule_engine()
-        predictor = get_predictor()
-        
-        transaction = {
-            "customer_id": "TEST",
-            "transaction_amount": 12000,
-            "kyc_verified": 0,
-            "account_age_days": 100
-        }
-        
-        ml_pred = predictor.predict(transaction)
-        rule_result = engine.evaluate_transaction(transaction, ml_pred)
+        transaction = canonical_transactions['no_kyc']
+        ml_pred = canonical_predictions['no_kyc']
+        rule_result = rule_engine.evaluate_transaction(transaction, ml_pred)
         
         assert 'rules_triggered' in rule_result
         assert len(rule_result['rules_triggered']) > 0
         assert any('KYC' in rule.lower() for rule in rule_result['rules_triggered'])
     
-    def test_new_account_high_amount_triggers_rule(self):
+    def test_new_account_high_amount_triggers_rule(self, rule_engine, canonical_transactions, canonical_predictions):
         """Test new account + high amount triggers rule"""
-        from src.realtime.rule_engine import get_rule_engine
-        from src.realtime.realtime_predictor import get_predictor
-        
-        engine = get_rule_engine()
-        predictor = get_predictor()
-        
-        transaction = {
-            "customer_id": "TEST",
-            "transaction_amount": 8000,
-            "kyc_verified": 1,
-            "account_age_days": 5  # Very new
-        }
-        
-        ml_pred = predictor.predict(transaction)
-        rule_result = engine.evaluate_transaction(transaction, ml_pred)
+        transaction = canonical_transactions['new_acct']  # very new account
+        ml_pred = canonical_predictions['new_acct']
+        rule_result = rule_engine.evaluate_transaction(transaction, ml_pred)
         
         # Should trigger new account rule
         assert len(rule_result['rules_triggered']) > 0
     
-    def test_legitimate_transaction_no_rules(self):
+    def test_legitimate_transaction_no_rules(self, rule_engine, canonical_transactions, canonical_predictions):
         """Test legitimate transaction doesn't trigger rules"""
-        from src.realtime.rule_engine import get_rule_engine
-        from src.realtime.realtime_predictor import get_predictor
-        
-        engine = get_rule_engine()
-        predictor = get_predictor()
-        
-        transaction = {
-            "customer_id": "TEST",
-            "transaction_amount": 100,  # Small amount
-            "kyc_verified": 1,
-            "account_age_days": 1000  # Established account
-        }
-        
-        ml_pred = predictor.predict(transaction)
-        rule_result = engine.evaluate_transaction(transaction, ml_pred)
+        transaction = canonical_transactions['legit']  # small amount, established account
+        ml_pred = canonical_predictions['legit']
+        rule_result = rule_engine.evaluate_transaction(transaction, ml_pred)
         
         # Might not trigger any rules
         assert 'rules_triggered' in rule_result
@@ -184,11 +154,8 @@ class TestRuleEngine:
 class TestLLMExplanation:
     """Test LLM explanation generation"""
     
-    def test_explainer_initialization(self):
+    def test_explainer_initialization(self, explainer):
         """Test explainer initializes"""
-        from src.realtime.explainer import get_explainer
-        
-        explainer = get_explainer()
         assert explainer is not None
     
     def test_fallback_explanation_always_works(self):
@@ -245,17 +212,39 @@ class TestLLMExplanation:
 # API TESTS - /predict
 # ============================================================================
 
+# Validation-rejection cases for /api/predict: (case id, payload,
+# substring expected in the error message or None). One parametrized
+# test covers them all - each case is the same shape, which also lets
+# xdist schedule them evenly. Payloads are encoded to bytes here, at
+# import time, so each test run just fires the bytes at the client.
+PREDICT_REJECT_CASES = [
+    ('missing_customer_id', _prejson({"transaction_amount": 5000}),
+     'customer_id'),
+    ('missing_amount', _prejson({"customer_id": "C123"}), None),
+    ('negative_amount',
+     _prejson({"customer_id": "C123", "transaction_amount": -1000}),
+     'positive'),
+    ('extremely_large_amount',
+     _prejson({"customer_id": "C123", "transaction_amount": 50000000}),
+     'exceed'),
+    ('invalid_kyc_value',
+     _prejson({"customer_id": "C123", "transaction_amount": 5000,
+               "kyc_verified": "invalid"}), None),
+    ('invalid_channel',
+     _prejson({"customer_id": "C123", "transaction_amount": 5000,
+               "channel": "InvalidChannel"}), None),
+]
+
+
 class TestPredictAPI:
     """Test /api/predict endpoint"""
-    
+
     def test_predict_success(self, client, sample_transaction):
         """Test successful prediction"""
-        response = client.post('/api/predict',
-                              data=json.dumps(sample_transaction),
-                              content_type='application/json')
+        response = post_json(client, '/api/predict', sample_transaction)
         
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         
         assert data['success'] is True
         assert 'transaction_id' in data
@@ -267,118 +256,31 @@ class TestPredictAPI:
     
     def test_predict_fraud_detection(self, client, fraud_transaction):
         """Test fraud is correctly detected"""
-        response = client.post('/api/predict',
-                              data=json.dumps(fraud_transaction),
-                              content_type='application/json')
+        response = post_json(client, '/api/predict', fraud_transaction)
         
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         
         assert data['success'] is True
         # High risk transaction should likely be fraud
         assert data['risk_score'] > 0.5
     
-    def test_predict_missing_customer_id(self, client):
-        """Test missing customer_id returns error"""
-        invalid_data = {
-            "transaction_amount": 5000
-        }
-        
-        response = client.post('/api/predict',
-                              data=json.dumps(invalid_data),
-                              content_type='application/json')
-        
-        assert response.status_code == 400
-        data = json.loads(response.data)
-        
-        assert data['success'] is False
-        assert 'error' in data
-        assert 'customer_id' in data['error'].lower()
-    
-    def test_predict_missing_amount(self, client):
-        """Test missing transaction_amount returns error"""
-        invalid_data = {
-            "customer_id": "C123"
-        }
-        
-        response = client.post('/api/predict',
-                              data=json.dumps(invalid_data),
-                              content_type='application/json')
-        
+    @pytest.mark.parametrize(
+        'payload,expected_substr',
+        [case[1:] for case in PREDICT_REJECT_CASES],
+        ids=[case[0] for case in PREDICT_REJECT_CASES])
+    def test_predict_rejects_invalid(self, client, payload, expected_substr):
+        """Test invalid payloads are rejected with a 400 and error message"""
+        response = post_json(client, '/api/predict', payload)
+
         assert response.status_code == 400
-        data = json.loads(response.data)
-        
+        data = response.get_json()
+
         assert data['success'] is False
         assert 'error' in data
-    
-    def test_predict_negative_amount(self, client):
-        """Test negative amount returns error"""
-        invalid_data = {
-            "customer_id": "C123",
-            "transaction_amount": -1000
-        }
-        
-        response = client.post('/api/predict',
-                              data=json.dumps(invalid_data),
-                              content_type='application/json')
-        
-        assert response.status_code == 400
-        data = json.loads(response.data)
-        
-        assert data['success'] is False
-        assert 'positive' in data['error'].lower()
-    
-    def test_predict_extremely_large_amount(self, client):
-        """Test extremely large amount returns error"""
-        invalid_data = {
-            "customer_id": "C123",
-            "transaction_amount": 50000000  # $50M
-        }
-        
-        response = client.post('/api/predict',
-                              data=json.dumps(invalid_data),
-                              content_type='application/json')
-        
-        assert response.status_code == 400
-        data = json.loads(response.data)
-        
-        assert data['success'] is False
-        assert 'exceed' in data['error'].lower()
-    
-    def test_predict_invalid_kyc_value(self, client):
-        """Test invalid KYC value returns error"""
-        invalid_data = {
-            "customer_id": "C123",
-            "transaction_amount": 5000,
-            "kyc_verified": "invalid"
-        }
-        
-        response = client.post('/api/predict',
-                              data=json.dumps(invalid_data),
-                              content_type='application/json')
-        
-        assert response.status_code == 400
-        data = json.loads(response.data)
-        
-        assert data['success'] is False
-    
-    def test_predict_invalid_channel(self, client):
-        """Test invalid channel returns error"""
-        invalid_data = {
-            "customer_id": "C123",
-            "transaction_amount": 5000,
-            "channel": "InvalidChannel"
-        }
-        
-        response = client.post('/api/predict',
-                              data=json.dumps(invalid_data),
-                              content_type='application/json')
-        
-        assert response.status_code == 400
-        data = json.loads(response.data)
-        
-        assert data['success'] is False
-    
+        if expected_substr is not None:
+            assert expected_substr in data['error'].lower()
+
     def test_predict_empty_request(self, client):
         """Test empty request returns error"""
         response = client.post('/api/predict',
@@ -389,11 +291,9 @@ class TestPredictAPI:
     
     def test_predict_response_schema(self, client, sample_transaction):
         """Test response has correct schema"""
-        response = client.post('/api/predict',
-                              data=json.dumps(sample_transaction),
-                              content_type='application/json')
+        response = post_json(client, '/api/predict', sample_transaction)
         
-        data = json.loads(response.data)
+        data = response.get_json()
         
         # Required top-level fields
         assert 'success' in data
@@ -422,7 +322,7 @@ class TestMetricsAPI:
         response = client.get('/api/metrics')
         
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         
         assert data['success'] is True
         assert 'metrics' in data
@@ -430,7 +330,7 @@ class TestMetricsAPI:
     def test_metrics_schema(self, client):
         """Test metrics has correct schema"""
         response = client.get('/api/metrics')
-        data = json.loads(response.data)
+        data = response.get_json()
         
         metrics = data['metrics']
         
@@ -457,7 +357,7 @@ class TestDashboardStatsAPI:
         response = client.get('/api/dashboard/stats')
         
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         
         assert data['success'] is True
         assert 'stats' in data or 'metrics' in data
@@ -465,7 +365,7 @@ class TestDashboardStatsAPI:
     def test_dashboard_stats_schema(self, client):
         """Test dashboard stats schema"""
         response = client.get('/api/dashboard/stats')
-        data = json.loads(response.data)
+        data = response.get_json()
         
         # Should have transaction counts
         content = str(data)
@@ -484,7 +384,7 @@ class TestAlertsAPI:
         response = client.get('/api/alerts')
         
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         
         assert data['success'] is True
         assert 'alerts' in data
@@ -495,14 +395,14 @@ class TestAlertsAPI:
         response = client.get('/api/alerts?limit=5')
         
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         
         assert len(data['alerts']) <= 5
     
     def test_alerts_schema(self, client):
         """Test alert objects have correct schema"""
         response = client.get('/api/alerts?limit=1')
-        data = json.loads(response.data)
+        data = response.get_json()
         
         if len(data['alerts']) > 0:
             alert = data['alerts'][0]
@@ -516,23 +416,34 @@ class TestAlertsAPI:
 # API TESTS - /auth/login
 # ============================================================================
 
+@pytest.fixture(scope='session')
+def admin_login(client):
+    """One admin login for the whole session: (status, parsed body).
+
+    The credentials are fixed, so any test needing an admin token can
+    read this cache instead of re-hitting /api/auth/login.
+    """
+    response = post_json(client, '/api/auth/login',
+                         {"username": "admin", "password": "admin123"})
+    return response.status_code, response.get_json()
+
+
+@pytest.fixture(scope='session')
+def analyst_login(client):
+    """One analyst login for the whole session: (status, parsed body)."""
+    response = post_json(client, '/api/auth/login',
+                         {"username": "analyst", "password": "analyst123"})
+    return response.status_code, response.get_json()
+
+
 class TestAuthAPI:
     """Test /api/auth/login endpoint"""
-    
-    def test_login_success(self, client):
+
+    def test_login_success(self, admin_login):
         """Test successful login"""
-        credentials = {
-            "username": "admin",
-            "password": "admin123"
-        }
-        
-        response = client.post('/api/auth/login',
-                              data=json.dumps(credentials),
-                              content_type='application/json')
-        
-        assert response.status_code == 200
-        data = json.loads(response.data)
-        
+        status, data = admin_login
+
+        assert status == 200
         assert data['success'] is True
         assert 'token' in data
         assert 'user' in data
@@ -545,14 +456,10 @@ class TestAuthAPI:
             "password": "wrongpassword"
         }
         
-        response = client.post('/api/auth/login',
-                              data=json.dumps(credentials),
-                              content_type='application/json')
-        
+        response = post_json(client, '/api/auth/login', credentials)
+
         assert response.status_code == 401
-        data = json.loads(response.data)
-        
-        assert data['success'] is False
+        assert _is_failure_body(response)
     
     def test_login_missing_username(self, client):
         """Test login with missing username"""
@@ -560,29 +467,16 @@ class TestAuthAPI:
             "password": "admin123"
         }
         
-        response = client.post('/api/auth/login',
-                              data=json.dumps(credentials),
-                              content_type='application/json')
-        
+        response = post_json(client, '/api/auth/login', credentials)
+
         assert response.status_code == 400
-        data = json.loads(response.data)
-        
-        assert data['success'] is False
+        assert _is_failure_body(response)
     
-    def test_login_analyst_user(self, client):
+    def test_login_analyst_user(self, analyst_login):
         """Test login with analyst user"""
-        credentials = {
-            "username": "analyst",
-            "password": "analyst123"
-        }
-        
-        response = client.post('/api/auth/login',
-                              data=json.dumps(credentials),
-                              content_type='application/json')
-        
-        assert response.status_code == 200
-        data = json.loads(response.data)
-        
+        status, data = analyst_login
+
+        assert status == 200
         assert data['success'] is True
         assert data['user']['role'] == 'analyst'
 
@@ -601,38 +495,22 @@ class TestEdgeCases:
             "transaction_amount": 0
         }
         
-        response = client.post('/api/predict',
-                              data=json.dumps(data),
-                              content_type='application/json')
+        response = post_json(client, '/api/predict', data)
         
         # Could be valid or invalid depending on business rules
         assert response.status_code in [200, 400]
     
     def test_boundary_amount_10million(self, client):
         """Test boundary at $10M"""
-        data = {
-            "customer_id": "C123",
-            "transaction_amount": 10000000
-        }
-        
-        response = client.post('/api/predict',
-                              data=json.dumps(data),
-                              content_type='application/json')
-        
+        response = post_json(client, '/api/predict', PAYLOAD_10M)
+
         # Should be rejected
         assert response.status_code == 400
-    
+
     def test_just_under_10million(self, client):
         """Test amount just under $10M limit"""
-        data = {
-            "customer_id": "C123",
-            "transaction_amount": 9999999
-        }
-        
-        response = client.post('/api/predict',
-                              data=json.dumps(data),
-                              content_type='application/json')
-        
+        response = post_json(client, '/api/predict', PAYLOAD_UNDER_10M)
+
         # Should be accepted
         assert response.status_code == 200
     
@@ -643,9 +521,7 @@ class TestEdgeCases:
             "transaction_amount": 5000
         }
         
-        response = client.post('/api/predict',
-                              data=json.dumps(data),
-                              content_type='application/json')
+        response = post_json(client, '/api/predict', data)
         
         # Should be rejected (max 100 chars)
         assert response.status_code == 400
@@ -657,9 +533,7 @@ class TestEdgeCases:
             "transaction_amount": 5000
         }
         
-        response = client.post('/api/predict',
-                              data=json.dumps(data),
-                              content_type='application/json')
+        response = post_json(client, '/api/predict', data)
         
         # Should be accepted (string validation)
         assert response.status_code == 200
@@ -678,13 +552,9 @@ class TestEdgeCases:
             "transaction_amount": 5000.50
         }
         
-        response1 = client.post('/api/predict',
-                               data=json.dumps(data1),
-                               content_type='application/json')
+        response1 = post_json(client, '/api/predict', data1)
         
-        response2 = client.post('/api/predict',
-                               data=json.dumps(data2),
-                               content_type='application/json')
+        response2 = post_json(client, '/api/predict', data2)
         
         assert response1.status_code == 200
         assert response2.status_code == 200
@@ -705,20 +575,16 @@ class TestEdgeCases:
             "account_age_days": 1000
         }
         
-        response_new = client.post('/api/predict',
-                                   data=json.dumps(data_new),
-                                   content_type='application/json')
+        response_new = post_json(client, '/api/predict', data_new)
         
-        response_old = client.post('/api/predict',
-                                   data=json.dumps(data_old),
-                                   content_type='application/json')
+        response_old = post_json(client, '/api/predict', data_old)
         
         assert response_new.status_code == 200
         assert response_old.status_code == 200
         
         # New account should have higher risk
-        data_new_result = json.loads(response_new.data)
-        data_old_result = json.loads(response_old.data)
+        data_new_result = response_new.get_json()
+        data_old_result = response_old.get_json()
         
         assert data_new_result['risk_score'] >= data_old_result['risk_score']
 
@@ -740,48 +606,37 @@ class TestIntegration:
             "account_age_days": 2
         }
         
-        response = client.post('/api/predict',
-                              data=json.dumps(transaction),
-                              content_type='application/json')
+        response = post_json(client, '/api/predict', transaction)
         
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         
         transaction_id = data['transaction_id']
         
         # Step 2: Check if alert was created (if fraud)
         if data['prediction'] == 'Fraud':
             alert_response = client.get('/api/alerts?limit=200')
-            alert_data = json.loads(alert_response.data)
+            alert_data = alert_response.get_json()
             
-            # Should find our transaction in alerts
-            alert_ids = [str(a.get('transaction_id', '')) for a in alert_data['alerts']]
+            # Should find our transaction in alerts; a set gives O(1)
+            # membership over the up-to-200 returned alerts
+            alert_ids = {str(a.get('transaction_id', '')) for a in alert_data['alerts']}
             # Not guaranteed to be there immediately, but check the flow worked
             assert alert_response.status_code == 200
     
     def test_consistent_predictions(self, client):
         """Test same transaction gives consistent predictions"""
-        transaction = {
-            "customer_id": "CONSISTENCY_TEST",
-            "transaction_amount": 3000,
-            "kyc_verified": 1,
-            "account_age_days": 500
-        }
-        
-        # Make same prediction twice
-        response1 = client.post('/api/predict',
-                               data=json.dumps(transaction),
-                               content_type='application/json')
-        
-        response2 = client.post('/api/predict',
-                               data=json.dumps(transaction),
-                               content_type='application/json')
+        # Make same prediction twice, reusing one pre-serialized payload
+        response1 = post_json(client, '/api/predict', PAYLOAD_CONSISTENCY)
+
+        response2 = post_json(client, '/api/predict', PAYLOAD_CONSISTENCY)
         
-        data1 = json.loads(response1.data)
-        data2 = json.loads(response2.data)
+        data1 = response1.get_json()
+        data2 = response2.get_json()
         
-        # Predictions should be the same (within small tolerance for ML)
-        assert abs(data1['risk_score'] - data2['risk_score']) < 0.05
+        # Predictions should be the same (within small tolerance for ML);
+        # isclose is also NaN-safe where abs(a - b) < tol silently passes
+        assert _isclose(data1['risk_score'], data2['risk_score'], abs_tol=0.05)
         assert data1['prediction'] == data2['prediction']
 
 
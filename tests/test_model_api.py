@@ -5,26 +5,58 @@ Validates prediction logic, risk scores, and model metrics.
 
 import pytest
 import json
-import numpy as np
-from flask import Flask
+from math import isclose as _isclose
+
+from conftest import post_json
+
+
+# Parametrized case tables - module-level so xdist can shard the cases
+# across workers and one failing case doesn't mask the rest
+RISK_RANGE_CASES = [
+    {'customer_id': 'C1', 'transaction_amount': 100},
+    {'customer_id': 'C2', 'transaction_amount': 50000},
+    {'customer_id': 'C3', 'transaction_amount': 150000},
+]
+CHANNEL_VARIATIONS = ['Web', 'web', 'Online', 'Mobile', 'mobile',
+                      'POS', 'pos', 'ATM', 'atm']
+REQUIRED_METRICS = frozenset(
+    ('accuracy', 'precision', 'recall', 'f1_score', 'roc_auc'))
+
+
+@pytest.fixture(scope='session')
+def model_available(client):
+    """Whether the model is loaded, probed once per session.
+
+    One GET replaces the per-test `if response.status_code != 503`
+    guards: when the model is missing the dependent tests skip up front
+    instead of each building, sending, and parsing a doomed request.
+    """
+    return client.get('/api/model/metrics').status_code != 503
+
+
+@pytest.fixture(scope='session')
+def model_metrics(client):
+    """One GET to /api/model/metrics shared by the metrics tests.
+
+    Returns (status_code, parsed body or None); four tests assert on
+    the same payload, so one fetch replaces four round trips.
+    """
+    response = client.get('/api/model/metrics')
+    body = response.get_json() if response.status_code == 200 else None
+    return response.status_code, body
 
 
 class TestModelAPI:
-    """Test suite for model prediction and metrics endpoints."""
-    
-    @pytest.fixture
-    def client(self):
-        """Create test client for Flask app."""
-        from src.api.app import app
-        app.config['TESTING'] = True
-        with app.test_client() as client:
-            yield client
-    
+    """Test suite for model prediction and metrics endpoints.
+
+    Uses the session-scoped `client` fixture from conftest.py, so the
+    Flask app and its model load happen once per session rather than
+    once per test method.
+    """
+
     def test_predict_endpoint_exists(self, client):
         """Test that /api/predict endpoint exists."""
-        response = client.post('/api/predict', 
-                              json={'customer_id': 'TEST', 'transaction_amount': 1000},
-                              content_type='application/json')
+        response = post_json(client, '/api/predict', {'customer_id': 'TEST', 'transaction_amount': 1000})
         assert response.status_code in [200, 400, 503], "Predict endpoint should exist"
     
     def test_predict_requires_json(self, client):
@@ -32,30 +64,30 @@ class TestModelAPI:
         response = client.post('/api/predict')
         assert response.status_code in [400, 415], "Should reject non-JSON requests"
     
-    def test_predict_requires_customer_id(self, client):
+    def test_predict_requires_customer_id(self, client, model_available):
         """Test that customer_id is required."""
-        response = client.post('/api/predict',
-                              json={'transaction_amount': 1000},
-                              content_type='application/json')
-        
-        if response.status_code != 503:  # Only test if model is loaded
-            data = response.get_json()
-            assert response.status_code == 400
-            assert 'customer_id' in data.get('error', '').lower()
-    
-    def test_predict_requires_transaction_amount(self, client):
+        if not model_available:
+            pytest.skip("Model not loaded")
+        response = post_json(client, '/api/predict', {'transaction_amount': 1000})
+
+        data = response.get_json()
+        assert response.status_code == 400
+        assert 'customer_id' in data.get('error', '').lower()
+
+    def test_predict_requires_transaction_amount(self, client, model_available):
         """Test that transaction_amount is required."""
-        response = client.post('/api/predict',
-                              json={'customer_id': 'TEST123'},
-                              content_type='application/json')
-        
-        if response.status_code != 503:
-            data = response.get_json()
-            assert response.status_code == 400
-            assert 'transaction_amount' in data.get('error', '').lower()
+        if not model_available:
+            pytest.skip("Model not loaded")
+        response = post_json(client, '/api/predict', {'customer_id': 'TEST123'})
+
+        data = response.get_json()
+        assert response.status_code == 400
+        assert 'transaction_amount' in data.get('error', '').lower()
     
-    def test_predict_low_risk_transaction(self, client):
+    def test_predict_low_risk_transaction(self, client, model_available):
         """Test prediction for low-risk transaction."""
+        if not model_available:
+            pytest.skip("Model not loaded")
         payload = {
             'customer_id': 'C_LOW_RISK',
             'kyc_verified': 1,
@@ -65,19 +97,20 @@ class TestModelAPI:
             'timestamp': '2025-09-12 10:15'
         }
         
-        response = client.post('/api/predict', json=payload, content_type='application/json')
-        
-        if response.status_code != 503:  # Only test if model is loaded
-            assert response.status_code == 200
-            data = response.get_json()
-            
-            assert data['success'] is True
-            assert 'prediction' in data
-            assert 'risk_score' in data
-            assert data['prediction'] in ['Fraud', 'Legitimate']
+        response = post_json(client, '/api/predict', payload)
+
+        assert response.status_code == 200
+        data = response.get_json()
+
+        assert data['success'] is True
+        assert 'prediction' in data
+        assert 'risk_score' in data
+        assert data['prediction'] in ['Fraud', 'Legitimate']
     
-    def test_predict_high_risk_transaction(self, client):
+    def test_predict_high_risk_transaction(self, client, model_available):
         """Test prediction for high-risk transaction."""
+        if not model_available:
+            pytest.skip("Model not loaded")
         payload = {
             'customer_id': 'C_HIGH_RISK',
             'kyc_verified': 0,
@@ -86,34 +119,28 @@ class TestModelAPI:
             'channel': 'Online',
             'timestamp': '2025-09-12 14:30'
         }
-        
-        response = client.post('/api/predict', json=payload, content_type='application/json')
-        
-        if response.status_code != 503:
-            assert response.status_code == 200
-            data = response.get_json()
-            
-            assert data['success'] is True
-            # High-risk transaction should likely be flagged
-            assert data['risk_score'] >= 0.0
+
+        response = post_json(client, '/api/predict', payload)
+
+        assert response.status_code == 200
+        data = response.get_json()
+
+        assert data['success'] is True
+        # High-risk transaction should likely be flagged
+        assert data['risk_score'] >= 0.0
     
-    def test_risk_score_in_valid_range(self, client):
+    @pytest.mark.parametrize('payload', RISK_RANGE_CASES,
+                             ids=lambda p: f"amount_{p['transaction_amount']}")
+    def test_risk_score_in_valid_range(self, client, payload):
         """Test that risk score is always between 0 and 1."""
-        test_cases = [
-            {'customer_id': 'C1', 'transaction_amount': 100},
-            {'customer_id': 'C2', 'transaction_amount': 50000},
-            {'customer_id': 'C3', 'transaction_amount': 150000},
-        ]
-        
-        for payload in test_cases:
-            response = client.post('/api/predict', json=payload, content_type='application/json')
-            
-            if response.status_code == 200:
-                data = response.get_json()
-                risk_score = data.get('risk_score')
-                
-                assert risk_score is not None, "Risk score should be present"
-                assert 0.0 <= risk_score <= 1.0, f"Risk score {risk_score} must be between 0 and 1"
+        response = post_json(client, '/api/predict', payload)
+
+        if response.status_code == 200:
+            data = response.get_json()
+            risk_score = data.get('risk_score')
+
+            assert risk_score is not None, "Risk score should be present"
+            assert 0.0 <= risk_score <= 1.0, f"Risk score {risk_score} must be between 0 and 1"
     
     def test_prediction_threshold_consistency(self, client):
         """Test that fraud prediction is consistent with threshold."""
@@ -124,7 +151,7 @@ class TestModelAPI:
             'account_age_days': 10
         }
         
-        response = client.post('/api/predict', json=payload, content_type='application/json')
+        response = post_json(client, '/api/predict', payload)
         
         if response.status_code == 200:
             data = response.get_json()
@@ -138,31 +165,28 @@ class TestModelAPI:
             else:
                 assert prediction == 'Legitimate', f"Risk {risk_score} < threshold {threshold} should predict Legitimate"
     
-    def test_model_metrics_endpoint(self, client):
+    def test_model_metrics_endpoint(self, model_metrics):
         """Test GET /api/model/metrics endpoint."""
-        response = client.get('/api/model/metrics')
-        
-        if response.status_code == 200:
-            data = response.get_json()
-            
+        status, data = model_metrics
+
+        if status == 200:
             assert data['success'] is True
             assert 'metrics' in data
             
             metrics = data['metrics']
-            
-            # Verify required metrics are present
-            required_metrics = ['accuracy', 'precision', 'recall', 'f1_score', 'roc_auc']
-            for metric in required_metrics:
-                assert metric in metrics, f"Missing required metric: {metric}"
+
+            # One set-subset check instead of a per-metric membership loop
+            assert REQUIRED_METRICS <= metrics.keys(), \
+                f"Missing required metrics: {sorted(REQUIRED_METRICS - metrics.keys())}"
+            for metric in REQUIRED_METRICS:
                 assert isinstance(metrics[metric], (int, float)), f"{metric} should be numeric"
                 assert 0.0 <= metrics[metric] <= 1.0, f"{metric} should be between 0 and 1"
     
-    def test_recall_greater_than_precision(self, client):
+    def test_recall_greater_than_precision(self, model_metrics):
         """Test that recall >= precision (fraud-first logic)."""
-        response = client.get('/api/model/metrics')
-        
-        if response.status_code == 200:
-            data = response.get_json()
+        status, data = model_metrics
+
+        if status == 200:
             metrics = data['metrics']
             
             recall = metrics['recall']
@@ -171,12 +195,11 @@ class TestModelAPI:
             assert recall >= precision, \
                 f"Recall ({recall:.4f}) should be >= Precision ({precision:.4f}) for fraud detection"
     
-    def test_fraud_detection_metrics_present(self, client):
+    def test_fraud_detection_metrics_present(self, model_metrics):
         """Test that fraud detection specific metrics are present."""
-        response = client.get('/api/model/metrics')
-        
-        if response.status_code == 200:
-            data = response.get_json()
+        status, data = model_metrics
+
+        if status == 200:
             metrics = data['metrics']
             
             if 'fraud_detection' in metrics:
@@ -193,12 +216,11 @@ class TestModelAPI:
                     assert abs(fd['detection_rate'] - expected_rate) < 0.01, \
                         "Detection rate calculation incorrect"
     
-    def test_confusion_matrix_present(self, client):
+    def test_confusion_matrix_present(self, model_metrics):
         """Test that confusion matrix is included in metrics."""
-        response = client.get('/api/model/metrics')
-        
-        if response.status_code == 200:
-            data = response.get_json()
+        status, data = model_metrics
+
+        if status == 200:
             metrics = data['metrics']
             
             if 'confusion_matrix' in metrics:
@@ -221,7 +243,7 @@ class TestModelAPI:
             'transaction_amount': 5000
         }
         
-        response = client.post('/api/predict', json=payload, content_type='application/json')
+        response = post_json(client, '/api/predict', payload)
         
         if response.status_code == 200:
             data = response.get_json()
@@ -251,11 +273,12 @@ class TestModelAPI:
             'timestamp': '2025-09-12 15:30'
         }
         
-        responses = []
-        for _ in range(3):
-            response = client.post('/api/predict', json=payload, content_type='application/json')
-            if response.status_code == 200:
-                responses.append(response.get_json())
+        # Serialize once and reuse the bytes for all three POSTs
+        body = json.dumps(payload).encode()
+        responses = [r.get_json()
+                     for r in (post_json(client, '/api/predict', body)
+                               for _ in range(3))
+                     if r.status_code == 200]
         
         if len(responses) >= 2:
             # All predictions should be identical
@@ -264,26 +287,28 @@ class TestModelAPI:
             
             for resp in responses[1:]:
                 assert resp['prediction'] == first_prediction, "Predictions should be consistent"
-                assert abs(resp['risk_score'] - first_risk_score) < 0.0001, "Risk scores should be consistent"
+                assert _isclose(resp['risk_score'], first_risk_score, abs_tol=0.0001), "Risk scores should be consistent"
     
     def test_channel_encoding_variations(self, client):
-        """Test that different channel name variations work."""
+        """Test that different channel name variations work, in one batch."""
         base_payload = {
             'customer_id': 'C_CHANNEL_TEST',
             'transaction_amount': 5000,
             'kyc_verified': 1,
             'account_age_days': 100
         }
-        
-        channels = ['Web', 'web', 'Online', 'Mobile', 'mobile', 'POS', 'pos', 'ATM', 'atm']
-        
-        for channel in channels:
-            payload = {**base_payload, 'channel': channel}
-            response = client.post('/api/predict', json=payload, content_type='application/json')
-            
-            if response.status_code == 200:
-                data = response.get_json()
-                assert 'risk_score' in data, f"Should handle channel: {channel}"
+        payloads = [dict(base_payload, channel=c) for c in CHANNEL_VARIATIONS]
+
+        # One request scores all variations; 8 fewer WSGI dispatches
+        # than posting each channel separately
+        response = post_json(client, '/api/predict/batch',
+                             {'transactions': payloads})
+
+        if response.status_code == 200:
+            data = response.get_json()
+            assert data['count'] == len(CHANNEL_VARIATIONS)
+            for channel, result in zip(CHANNEL_VARIATIONS, data['results']):
+                assert 'risk_score' in result, f"Should handle channel: {channel}"
 
 
 if __name__ == '__main__':
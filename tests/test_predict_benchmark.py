@@ -0,0 +1,38 @@
+"""
+Latency regression guard for the /api/predict endpoint.
+
+Benchmarks the full POST -> parse round trip on a canonical payload so
+a JSON-serde or preprocessing regression shows up in CI numbers instead
+of in production. Skipped entirely when pytest-benchmark is not
+installed (it also disables itself under xdist workers).
+
+Compare runs with:
+    pytest tests/test_predict_benchmark.py -p no:xdist \
+        --benchmark-save=baseline
+    pytest tests/test_predict_benchmark.py -p no:xdist \
+        --benchmark-compare --benchmark-compare-fail=mean:10%
+"""
+
+import json
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+# Canonical payload, serialized once at import
+PREDICT_BODY = json.dumps({
+    'customer_id': 'C_BENCHMARK',
+    'transaction_amount': 5000,
+    'kyc_verified': 1,
+    'account_age_days': 365,
+    'channel': 'Web'
+}).encode()
+
+
+def test_predict_latency_regression(client, benchmark):
+    """Benchmark the predict round trip on a fixed payload."""
+    response = benchmark(
+        lambda: client.post('/api/predict', data=PREDICT_BODY,
+                            content_type='application/json')
+    )
+    assert response.status_code == 200